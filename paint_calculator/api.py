@@ -1,20 +1,38 @@
 import math
 import re
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from paint_calculator.json_stream import iter_json_object
 
 api = Blueprint('api', 'api', url_prefix='/api')
 
 
 @api.route('/v1/calculate', methods=['POST'])
 def calculate():
-    data = request.json
-    if not isinstance(data, dict):
+    if not request.is_json:
+        return jsonify({"error": "Content-Type must be application/json"}), 415
+    try:
+        return calculate_rooms(iter_json_object(request.stream))
+    except RequestEntityTooLarge:
+        return jsonify({"error": "Request body too large"}), 413
+    except ValueError:
         return jsonify({"error": "Invalid JSON payload"}), 400
+
+
+def calculate_rooms(rooms):
+    """
+    Calculates the feet and gallons for each room as it is read, without holding the whole request
+    :param rooms: Iterable of (room number, dict of L/W/H information) pairs
+    :return: JSON response of per-room results and the total gallons, or an error response
+    """
+    max_rooms = current_app.config['MAX_ROOMS']
     formatted_data = {}
-    total_gallons_required = 0
 
-    for room_number, room_data in data.items():
+    for room_count, (room_number, room_data) in enumerate(rooms, start=1):
+        if room_count > max_rooms:
+            return jsonify({"error": f"Too many rooms, the limit is {max_rooms}"}), 413
         # Validate required fields
         try:
             _ = room_data['length']
@@ -30,8 +48,8 @@ def calculate():
             formatted_data[room_number]['room'] = re.search(r'(\d+)$', room_number).group(0)
         except (ValueError, TypeError):
             return jsonify({"error": f"Invalid numeric values for {room_number}"}), 400
-        total_gallons_required += formatted_data[room_number]['gallons']
-    formatted_data['total_gallons'] = total_gallons_required
+    # Summed after reading every room so a duplicated room only counts once, keeping the last value like json.loads
+    formatted_data['total_gallons'] = sum(room['gallons'] for room in formatted_data.values())
     return jsonify(formatted_data)
 
 
@@ -2,3 +2,29 @@
 
 # Enable Flask's debugging features. Should be False in production
 DEBUG = True
+
+# Requests with a larger body (in bytes) are rejected with 413 before they are read
+MAX_CONTENT_LENGTH = 2 * 1024 * 1024
+# Maximum number of rooms accepted by a single /api/v1/calculate request
+MAX_ROOMS = 10000
+
+# The results page calculates paint locally. When enabled, it also checks its results
+# against /api/v1/calculate in batches of VERIFY_BATCH_SIZE rooms (clamped to 1 - MAX_ROOMS)
+VERIFY_RESULTS = False
+VERIFY_BATCH_SIZE = 1000
+
+# Opt-in request profiling. When disabled, no request is ever profiled and the
+# /admin/profiles endpoints return 404
+PROFILING_ENABLED = False
+# A request is profiled when it carries this header (or a `profile` query arg)
+# whose value matches PROFILING_TOKEN. The admin endpoints require the same header.
+# Nothing is profiled on demand and the admin endpoints return 403 until a token is set.
+# Only the thread serving a profiled request is recorded, so concurrent requests are unaffected
+PROFILING_HEADER = 'X-Profile'
+PROFILING_TOKEN = None
+# Fraction (0.0 - 1.0) of all other requests to profile
+PROFILING_SAMPLE_RATE = 0.0
+# Directory for stored profiles; None uses a folder in the system temp directory
+PROFILING_DIR = None
+# Only the newest PROFILING_MAX_PROFILES profiles are kept on disk
+PROFILING_MAX_PROFILES = 50
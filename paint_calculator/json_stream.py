@@ -0,0 +1,118 @@
+import codecs
+import json
+import re
+
+# Bytes read from the request stream at a time
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_whitespace = ' \t\n\r'
+_number_continuation = re.compile(r'[.eE+-]*')
+
+
+class _StreamReader:
+    """
+    Buffers just enough UTF-8 text from a binary stream to decode the next JSON value
+    """
+
+    def __init__(self, stream, chunk_size):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """
+        Drops the consumed part of the buffer and appends the next chunk of the stream
+        :return: False if the stream was already exhausted
+        """
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos:] + self.text_decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Skips whitespace
+        :return: The next character, or an empty string at the end of the stream
+        """
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _whitespace:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        """
+        Consumes `char`, raising a JSONDecodeError if the next character is anything else
+        """
+        if self.peek() != char:
+            raise json.JSONDecodeError(f'Expecting {char!r}', self.buffer, self.pos)
+        self.pos += 1
+
+    def is_truncated(self, obj, end):
+        """
+        :param obj: Value decoded from the buffer
+        :param end: Position in the buffer where the value ended
+        :return: True if the value may continue in the part of the stream not read yet
+        """
+        if end == len(self.buffer):
+            return True
+        is_number = isinstance(obj, (int, float)) and not isinstance(obj, bool)
+        return is_number and _number_continuation.fullmatch(self.buffer, end) is not None
+
+    def value(self):
+        """
+        Decodes the next complete JSON value, reading more of the stream until it fits in the buffer
+        :return: The decoded value
+        """
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A value ending exactly at the end of the buffer may be truncated (e.g. a number), as may
+            # a number followed only by the start of its fraction or exponent (e.g. `1.` or `2e`)
+            if self.is_truncated(obj, end) and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_json_object(stream, chunk_size=CHUNK_SIZE):
+    """
+    Incrementally parses a top-level JSON object from a binary stream, so that only one member
+    is held in memory at a time instead of the whole document
+    :param stream: File-like object of UTF-8 encoded JSON, e.g. `request.stream`
+    :param chunk_size: Number of bytes to read from the stream at a time
+    :return: Generator of (key, value) pairs in document order
+    :raises ValueError: If the stream is not a single valid JSON object
+    """
+    reader = _StreamReader(stream, chunk_size)
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.pos += 1
+    else:
+        while True:
+            if reader.peek() != '"':
+                raise json.JSONDecodeError('Expecting property name enclosed in double quotes',
+                                           reader.buffer, reader.pos)
+            key = reader.value()
+            reader.expect(':')
+            yield key, reader.value()
+            if reader.peek() != ',':
+                break
+            reader.pos += 1
+        reader.expect('}')
+    if reader.peek():
+        raise json.JSONDecodeError('Extra data', reader.buffer, reader.pos)
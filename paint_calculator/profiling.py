@@ -0,0 +1,294 @@
+import hmac
+import os
+import pstats
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+from flask import Blueprint, abort, current_app, g, jsonify, request, send_from_directory
+
+profiling = Blueprint('profiling', 'profiling', url_prefix='/admin/profiles')
+
+_profile_id_pattern = re.compile(r'^\d{20}-[\w.-]+$')
+
+
+class StackProfiler:
+    """
+    Deterministic profiler for the thread that starts it, recording full call stacks.
+    cProfile can't be used here: from Python 3.12 it records every thread in the interpreter, so a profile
+    would include concurrent requests and slow them down. `sys.setprofile` only affects the calling thread.
+    The recorded stats have the same shape as cProfile's, so `pstats.Stats(profiler)` can load them
+    """
+
+    def __init__(self):
+        self.stats = {}
+        # func -> [primitive calls, total calls, own time, cumulative time, {caller: [same four]}]
+        self.functions = defaultdict(lambda: [0, 0, 0.0, 0.0, defaultdict(lambda: [0, 0, 0.0, 0.0])])
+        # tuple of frame labels from the outermost frame -> own time in seconds
+        self.stacks = defaultdict(float)
+        # [func, label, frame, start time, time spent in callees] for calls made while profiling
+        self.calls = []
+        self.active = Counter()
+        # Labels and frames of the calls that were already running when profiling started
+        self.outer_labels = []
+        self.outer_frames = []
+
+    def start(self):
+        """
+        Starts recording the current thread, attributing calls to the frames that called `start`'s caller
+        :return: False if another profiler is already recording this thread
+        """
+        if sys.getprofile() is not None:
+            return False
+        frame = sys._getframe(2)
+        while frame is not None:
+            self.outer_frames.insert(0, frame)
+            self.outer_labels.insert(0, label(code_key(frame.f_code)))
+            frame = frame.f_back
+        sys.setprofile(self.dispatch)
+        return True
+
+    def stop(self):
+        """
+        Stops recording. Calls still running are not counted
+        """
+        sys.setprofile(None)
+
+    def dispatch(self, frame, event, arg):
+        if event == 'call':
+            self.enter(code_key(frame.f_code), frame)
+        elif event == 'c_call':
+            self.enter(builtin_key(arg), frame)
+        elif event == 'return':
+            if self.calls and self.calls[-1][2] is frame and self.calls[-1][0][0] != '~':
+                self.leave()
+            elif not self.calls and self.outer_frames and self.outer_frames[-1] is frame:
+                # One of the calls running before profiling started has finished
+                self.outer_frames.pop()
+                self.outer_labels.pop()
+        elif event in ('c_return', 'c_exception'):
+            if self.calls and self.calls[-1][2] is frame and self.calls[-1][0][0] == '~':
+                self.leave()
+
+    def enter(self, func, frame):
+        self.calls.append([func, label(func), frame, time.perf_counter(), 0.0])
+        self.active[func] += 1
+
+    def leave(self):
+        func, _, _, start, callee_time = self.calls[-1]
+        elapsed = time.perf_counter() - start
+        own_time = elapsed - callee_time
+        self.stacks[tuple(self.outer_labels) + tuple(call[1] for call in self.calls)] += own_time
+        self.calls.pop()
+        self.active[func] -= 1
+        caller = self.calls[-1][0] if self.calls else None
+        if self.calls:
+            self.calls[-1][4] += elapsed
+
+        # Like cProfile, recursive calls are not primitive and don't add to the cumulative time again
+        primitive = self.active[func] == 0
+        entries = [self.functions[func]]
+        if caller is not None:
+            entries.append(self.functions[func][4][caller])
+        for entry in entries:
+            entry[0] += primitive
+            entry[1] += 1
+            entry[2] += own_time
+            entry[3] += elapsed if primitive else 0.0
+
+    def create_stats(self):
+        """
+        Builds `stats` in cProfile's format, as used by `pstats.Stats`
+        """
+        self.stats = {func: (cc, nc, tt, ct, {caller: tuple(edge) for caller, edge in callers.items()})
+                      for func, (cc, nc, tt, ct, callers) in self.functions.items()}
+
+    def collapsed(self):
+        """
+        :return: str of the recorded stacks in the collapsed-stack format read by flamegraph.pl and speedscope,
+            one `outermost;...;innermost <own time in microseconds>` line per distinct stack
+        """
+        lines = [f'{";".join(stack)} {int(own_time * 1e6)}' for stack, own_time in self.stacks.items()
+                 if int(own_time * 1e6)]
+        return '\n'.join(sorted(lines)) + '\n'
+
+
+def code_key(code):
+    """
+    :return: cProfile's (filename, line number, name) key for a Python function
+    """
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+def builtin_key(func):
+    """
+    :return: cProfile's key for a built-in function, e.g. ('~', 0, '<built-in method builtins.len>')
+    """
+    module = getattr(func, '__module__', None) or type(getattr(func, '__self__', None)).__name__
+    return '~', 0, f'<built-in method {module}.{getattr(func, "__name__", repr(func))}>'
+
+
+def label(func):
+    """
+    :return: Frame label used in collapsed stacks, e.g. `calculate (api.py:23)`
+    """
+    filename, lineno, name = func
+    return f'{name} ({os.path.basename(filename)}:{lineno})' if lineno else name
+
+
+def init_profiling(app):
+    """
+    Registers the profiling hooks and admin endpoints on an application
+    :param app: Flask application
+    :return: None
+    """
+    app.register_blueprint(profiling)
+    app.before_request(start_profiling)
+    app.after_request(add_profile_id_header)
+    app.teardown_request(stop_profiling)
+
+
+def is_authorized():
+    """
+    Checks whether the current request carries a valid profiling flag. Fails closed when no token is configured
+    :return: True if the header or `profile` query arg matches PROFILING_TOKEN
+    """
+    token = current_app.config['PROFILING_TOKEN']
+    value = request.headers.get(current_app.config['PROFILING_HEADER']) or request.args.get('profile')
+    if not token or not value:
+        return False
+    return hmac.compare_digest(value.encode('utf-8'), token.encode('utf-8'))
+
+
+def should_profile():
+    """
+    Decides whether the current request is profiled, either on demand or by sampling
+    :return: True if the request should run under the profiler
+    """
+    if not current_app.config['PROFILING_ENABLED'] or request.blueprint == 'profiling':
+        return False
+    if is_authorized():
+        return True
+    sample_rate = current_app.config['PROFILING_SAMPLE_RATE']
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+def start_profiling():
+    """
+    Starts a profiler for the current request when it has been selected for profiling
+    """
+    if not should_profile():
+        return
+    profiler = StackProfiler()
+    if profiler.start():
+        g.profiler = profiler
+        endpoint = re.sub(r'[^\w.-]', '_', request.endpoint or 'unknown')
+        g.profile_id = f'{time.time_ns():020d}-{request.method}-{endpoint}'
+
+
+def add_profile_id_header(response):
+    """
+    Tells the caller which stored profile belongs to their request. Requests that were not profiled get no header
+    :param response: Response for the current request
+    :return: The response, with an X-Profile-Id header if the request is being profiled
+    """
+    if 'profile_id' in g:
+        response.headers['X-Profile-Id'] = g.profile_id
+    return response
+
+
+def stop_profiling(exc):
+    """
+    Stops the request's profiler, if any, and stores the result in the profile directory
+    :param exc: Unhandled exception raised by the request, if any
+    """
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return
+    profiler.stop()
+    profile_id = g.pop('profile_id')
+    directory = get_profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f'{profile_id}.collapsed'), 'w') as collapsed_file:
+        collapsed_file.write(profiler.collapsed())
+    pstats.Stats(profiler).dump_stats(os.path.join(directory, f'{profile_id}.pstats'))
+    trim_profiles(directory, current_app.config['PROFILING_MAX_PROFILES'])
+
+
+def get_profile_dir():
+    """
+    :return: The configured profile directory, or a default one in the system temp directory
+    """
+    return current_app.config['PROFILING_DIR'] or os.path.join(tempfile.gettempdir(), 'paint_calculator_profiles')
+
+
+def list_profiles(directory):
+    """
+    :param directory: Profile directory
+    :return: Profile ids stored in the directory, oldest first
+    """
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len('.pstats')] for name in os.listdir(directory)
+                  if name.endswith('.pstats') and _profile_id_pattern.match(name[:-len('.pstats')]))
+
+
+def trim_profiles(directory, max_profiles):
+    """
+    Deletes the oldest profiles so that at most `max_profiles` remain, making the directory a ring buffer
+    :param directory: Profile directory
+    :param max_profiles: Number of profiles to keep
+    """
+    profile_ids = list_profiles(directory)
+    for profile_id in profile_ids[:max(len(profile_ids) - max_profiles, 0)]:
+        for extension in ('.pstats', '.collapsed'):
+            try:
+                os.remove(os.path.join(directory, f'{profile_id}{extension}'))
+            except FileNotFoundError:
+                pass
+
+
+@profiling.before_request
+def restrict_access():
+    """
+    Hides the admin endpoints unless profiling is enabled and the request carries the profiling flag
+    """
+    if not current_app.config['PROFILING_ENABLED']:
+        abort(404)
+    if not is_authorized():
+        abort(403)
+
+
+@profiling.route('', methods=['GET'])
+def profiles():
+    """
+    Lists the stored profiles
+    :return: JSON list of profile ids, newest first
+    """
+    return jsonify(list(reversed(list_profiles(get_profile_dir()))))
+
+
+@profiling.route('/<profile_id>.pstats', methods=['GET'])
+def profile_pstats(profile_id):
+    """
+    :param profile_id: Id of a stored profile
+    :return: The raw pstats file, loadable with `pstats.Stats` or snakeviz
+    """
+    if not _profile_id_pattern.match(profile_id):
+        abort(404)
+    return send_from_directory(get_profile_dir(), f'{profile_id}.pstats',
+                               mimetype='application/octet-stream', as_attachment=True)
+
+
+@profiling.route('/<profile_id>.collapsed', methods=['GET'])
+def profile_collapsed(profile_id):
+    """
+    :param profile_id: Id of a stored profile
+    :return: The profile in collapsed-stack format, for flame-graph tools
+    """
+    if not _profile_id_pattern.match(profile_id):
+        abort(404)
+    return send_from_directory(get_profile_dir(), f'{profile_id}.collapsed', mimetype='text/plain')
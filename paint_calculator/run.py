@@ -3,12 +3,17 @@ import json
 from flask import Flask, render_template, request
 from flask_bootstrap import Bootstrap
 
+from paint_calculator import config
 from paint_calculator.api import api, sanitize_input
+from paint_calculator.profiling import init_profiling
 
 app = Flask(__name__)
+# Load the settings from config.py. DEBUG is left out so the server never starts the debugger by default
+app.config.from_mapping({key: getattr(config, key) for key in dir(config) if key.isupper() and key != 'DEBUG'})
 app.register_blueprint(api)
 app.config['BOOTSTRAP_SERVE_LOCAL'] = True
 Bootstrap(app)
+init_profiling(app)
 
 
 @app.route('/')
@@ -44,7 +49,11 @@ def results():
             f'width': request.form[f'width-{i}'],
             f'height': request.form[f'height-{i}']
         }
-    return render_template("results.html", dimensions_data=dimensions_data, stored_data=json.dumps(dimensions_data))
+    # Each verification batch is an API request, so it must have at least one room and at most MAX_ROOMS
+    verify_batch_size = max(1, min(app.config['VERIFY_BATCH_SIZE'], app.config['MAX_ROOMS']))
+    return render_template("results.html", dimensions_data=dimensions_data, stored_data=json.dumps(dimensions_data),
+                           verify_results=app.config['VERIFY_RESULTS'],
+                           verify_batch_size=verify_batch_size)
 
 
 # Boiler plate for starting the application
@@ -0,0 +1,69 @@
+/*
+ * Paint calculations matching paint_calculator/api.py. Loaded by the results page and,
+ * for large room counts, as a Web Worker script that calculates the rooms it is sent.
+ */
+var PaintCalculations = (function() {
+    // 1 gallon covers 400 square feet (per footer specification)
+    var FEET_PER_GALLON = 400;
+    var INTEGER_PATTERN = /^\s*[+-]?\d+\s*$/;
+
+    // Accepts numbers and plain ASCII integer strings. Python's int() accepts more (e.g. '1_0' or
+    // non-ASCII digits), so a room rejected here is not necessarily rejected by the server
+    function toInteger(value) {
+        if (typeof value === 'number') {
+            return value < 0 ? Math.ceil(value) : Math.floor(value);
+        }
+        if (typeof value === 'string' && INTEGER_PATTERN.test(value)) {
+            return parseInt(value, 10);
+        }
+        return NaN;
+    }
+
+    function calculateFeet(length, width, height) {
+        return ((length * 2) + (width * 2)) * height;
+    }
+
+    function calculateGallonsRequired(feet) {
+        return Math.ceil(feet / FEET_PER_GALLON);
+    }
+
+    // Returns the same shape as /api/v1/calculate, or {error: ...} for the first invalid room
+    function calculateRooms(rooms) {
+        var results = {};
+        var totalGallons = 0;
+        for (var roomNumber in rooms) {
+            if (!Object.prototype.hasOwnProperty.call(rooms, roomNumber)) {
+                continue;
+            }
+            var room = rooms[roomNumber];
+            if (!room || room.length === undefined || room.width === undefined || room.height === undefined) {
+                return {error: 'Missing required fields for ' + roomNumber};
+            }
+            var length = toInteger(room.length);
+            var width = toInteger(room.width);
+            var height = toInteger(room.height);
+            var roomMatch = /(\d+)$/.exec(roomNumber);
+            if (isNaN(length) || isNaN(width) || isNaN(height) || !roomMatch) {
+                return {error: 'Invalid numeric values for ' + roomNumber};
+            }
+            var feet = calculateFeet(length, width, height);
+            var gallons = calculateGallonsRequired(feet);
+            results[roomNumber] = {ft: feet, gallons: gallons, room: roomMatch[0]};
+            totalGallons += gallons;
+        }
+        results['total_gallons'] = totalGallons;
+        return results;
+    }
+
+    return {
+        calculateFeet: calculateFeet,
+        calculateGallonsRequired: calculateGallonsRequired,
+        calculateRooms: calculateRooms
+    };
+})();
+
+if (typeof window === 'undefined' && typeof self !== 'undefined') {
+    self.onmessage = function(event) {
+        self.postMessage(PaintCalculations.calculateRooms(event.data));
+    };
+}
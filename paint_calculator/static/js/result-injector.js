@@ -1,7 +1,127 @@
 $(document).ready(function() {
+    // Above this many rooms the calculations run in a Web Worker so the UI thread never blocks
+    var WORKER_THRESHOLD = 1000;
+    // Rows filled in per animation frame, so thousands of rooms don't stall the page
+    var ROWS_PER_FRAME = 500;
+    // Rooms per verification request when the page doesn't provide a usable batch size
+    var DEFAULT_VERIFY_BATCH_SIZE = 1000;
+    var endpoint = '/api/v1/calculate';
+
+    function renderResults(data, done) {
+        var roomNames = Object.keys(data).filter(function(roomName) {
+            return roomName != 'total_gallons';
+        });
+        var index = 0;
+
+        function renderRows() {
+            var end = Math.min(index + ROWS_PER_FRAME, roomNames.length);
+            for (; index < end; index++) {
+                renderRoom(roomNames[index], data[roomNames[index]]);
+            }
+            if (index < roomNames.length) {
+                window.requestAnimationFrame(renderRows);
+            } else {
+                renderTotal(data['total_gallons']);
+                if (done) {
+                    done();
+                }
+            }
+        }
+
+        renderRows();
+    }
+
+    function renderRoom(roomName, val) {
+        var row = document.getElementById(roomName);
+        if (!row) {
+            return;
+        }
+        var tds = row.getElementsByTagName('td');
+        tds[0].textContent = val['room'];
+        tds[1].textContent = val['ft'];
+        tds[2].textContent = val['gallons'];
+    }
+
+    function renderTotal(totalGallons) {
+        $("#sumGallons").text('Total Gallons Required: ' + totalGallons);
+    }
+
+    function calculateLocally(rooms, roomCount, workerUrl, callback) {
+        if (roomCount > WORKER_THRESHOLD && window.Worker && workerUrl) {
+            try {
+                var worker = new Worker(workerUrl);
+                worker.onmessage = function(event) {
+                    worker.terminate();
+                    callback(event.data);
+                };
+                worker.onerror = function(event) {
+                    console.error('Worker error:', event.message);
+                    worker.terminate();
+                    callback(PaintCalculations.calculateRooms(rooms));
+                };
+                worker.postMessage(rooms);
+                return;
+            } catch (e) {
+                console.error('Could not start worker, calculating on the page:', e);
+            }
+        }
+        callback(PaintCalculations.calculateRooms(rooms));
+    }
+
+    // Checks the local results against the server in batches, and shows the server's values on a mismatch.
+    // With no local results, this renders the server's results for every room
+    function verifyResults(rooms, localData, batchSize) {
+        var roomNames = Object.keys(rooms);
+        var serverTotal = 0;
+        batchSize = parseInt(batchSize, 10);
+        if (!(batchSize > 0)) {
+            batchSize = DEFAULT_VERIFY_BATCH_SIZE;
+        }
+
+        function verifyBatch(start) {
+            if (start >= roomNames.length) {
+                if (serverTotal != localData['total_gallons']) {
+                    if (localData['total_gallons'] !== undefined) {
+                        console.warn('Total gallons differ from server:', localData['total_gallons'], serverTotal);
+                    }
+                    renderTotal(serverTotal);
+                }
+                return;
+            }
+            var batch = {};
+            $.each(roomNames.slice(start, start + batchSize), function(i, roomName) {
+                batch[roomName] = rooms[roomName];
+            });
+            $.ajax(endpoint, {
+                data: JSON.stringify(batch),
+                contentType: 'application/json',
+                type: 'POST',
+                success: function(data) {
+                    $.each(data, function(roomName, val) {
+                        if (roomName == 'total_gallons') {
+                            serverTotal += val;
+                        } else if (!localData[roomName] || localData[roomName]['ft'] != val['ft'] ||
+                                   localData[roomName]['gallons'] != val['gallons']) {
+                            if (localData[roomName]) {
+                                console.warn('Calculation for ' + roomName + ' differs from server:', localData[roomName], val);
+                            }
+                            renderRoom(roomName, val);
+                        }
+                    });
+                    verifyBatch(start + batchSize);
+                },
+                error: function(xhr, status, error) {
+                    console.error('AJAX error:', xhr.responseText);
+                }
+            });
+        }
+
+        verifyBatch(0);
+    }
+
     function insertPaintCalculations() {
-        var dimensionData = $('#dimensions').text();
-        var endpoint = '/api/v1/calculate';
+        var dimensions = $('#dimensions');
+        var dimensionData = dimensions.text();
 
         if (!dimensionData) {
             console.error('No dimension data found');
@@ -13,38 +133,33 @@ $(document).ready(function() {
 
             // Transform the data to match API expectations
             var transformedData = {};
+            var roomCount = 0;
             $.each(parsedData, function(roomKey, roomData) {
                 transformedData[roomKey] = {
                     length: roomData.length,
                     width: roomData.width,
                     height: roomData.height
                 };
+                roomCount++;
             });
 
-            $.ajax(endpoint, {
-                data: JSON.stringify(transformedData),
-                contentType: 'application/json',
-                type: 'POST',
-                success: function(data) {
-                    $.each(data, function(roomName, val) {
-                        if (roomName == 'total_gallons') {
-                            $("#sumGallons").text('Total Gallons Required: ' + val);
-                        } else {
-                            var tds = $('#' + roomName).find('td');
-                            tds.eq(0).text(val['room']);
-                            tds.eq(1).text(val['ft']);
-                            tds.eq(2).text(val['gallons']);
-                        }
-                    });
-                },
-                error: function(xhr, status, error) {
-                    console.error('AJAX error:', xhr.responseText);
+            calculateLocally(transformedData, roomCount, dimensions.data('worker'), function(data) {
+                if (data.error) {
+                    // The server may still accept values the browser rejects, so let it fill in the table
+                    console.warn('Calculating on the server:', data.error);
+                    verifyResults(transformedData, {}, dimensions.data('verifyBatchSize'));
+                    return;
                 }
+                renderResults(data, function() {
+                    if (dimensions.data('verify')) {
+                        verifyResults(transformedData, data, dimensions.data('verifyBatchSize'));
+                    }
+                });
             });
         } catch (e) {
             console.error('Error parsing dimension data:', e);
         }
     }
 
-    setTimeout(insertPaintCalculations, 5000)
-});
\ No newline at end of file
+    insertPaintCalculations();
+});
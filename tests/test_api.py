@@ -2,8 +2,11 @@
 Unit tests for the paint calculator API functions.
 """
 import pytest
+import io
+import json
 import math
 from paint_calculator.api import calculate_feet, calculate_gallons_required, sanitize_input
+from paint_calculator.json_stream import iter_json_object
 
 
 class TestCalculateFeet:
@@ -101,3 +104,43 @@ class TestSanitizeInput:
         """Test that float strings are converted to int."""
         assert sanitize_input('10.5') == 10
         assert sanitize_input('10.9') == 10
+
+
+class TestIterJsonObject:
+    """Test cases for the incremental iter_json_object parser."""
+
+    def parse(self, text, chunk_size=4):
+        return list(iter_json_object(io.BytesIO(text.encode('utf-8')), chunk_size=chunk_size))
+
+    def test_iter_json_object_matches_json_loads(self):
+        """Test that members split across small chunks are parsed like json.loads."""
+        data = {f'room-{i}': {'length': str(i), 'width': 12, 'height': 8.5, 'note': 'caf\u00e9 \\ "x"'}
+                for i in range(1, 20)}
+        text = json.dumps(data, ensure_ascii=False)
+        for chunk_size in (1, 3, 7, 1024):
+            assert dict(self.parse(text, chunk_size)) == data
+
+    def test_iter_json_object_numbers_across_chunks(self):
+        """Test that a number cut by a chunk boundary is not truncated, at every boundary."""
+        for chunk_size in range(1, 11):
+            assert self.parse('{"a": 123456789}', chunk_size) == [('a', 123456789)]
+            assert self.parse('{"a": 1.5}', chunk_size) == [('a', 1.5)]
+            assert self.parse('{"a": 2e3}', chunk_size) == [('a', 2e3)]
+            assert self.parse('{"a": -2.5E-3, "b": 7}', chunk_size) == [('a', -2.5e-3), ('b', 7)]
+
+    def test_iter_json_object_empty(self):
+        """Test an empty object with surrounding whitespace."""
+        assert self.parse(' { } \n') == []
+
+    def test_iter_json_object_is_lazy(self):
+        """Test that members are yielded before the rest of the stream is read."""
+        stream = io.BytesIO(b'{"a": 1, "b": 2}')
+        rooms = iter_json_object(stream, chunk_size=8)
+        assert next(rooms) == ('a', 1)
+        assert stream.tell() < len(stream.getvalue())
+
+    def test_iter_json_object_invalid(self):
+        """Test that malformed or non-object documents raise ValueError."""
+        for text in ('', '[1, 2]', '{"a": 1', '{"a" 1}', '{a: 1}', '{"a": 1,}', '{"a": 1} x'):
+            with pytest.raises(ValueError):
+                self.parse(text)
@@ -3,7 +3,11 @@ End-to-end tests using Playwright for the paint calculator application.
 """
 import pytest
 import re
+import threading
 from playwright.sync_api import Page, expect
+from werkzeug.serving import make_server
+
+from paint_calculator.run import app
 
 
 @pytest.fixture(scope="session")
@@ -12,6 +16,36 @@ def app_url():
     return "http://localhost:9200"
 
 
+@pytest.fixture
+def verify_app_url(monkeypatch):
+    """Serve the application in-process with server verification enabled, in batches of 2 rooms."""
+    monkeypatch.setitem(app.config, "VERIFY_RESULTS", True)
+    monkeypatch.setitem(app.config, "VERIFY_BATCH_SIZE", 2)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def submit_rooms(page: Page, url, rooms, length, width, height):
+    """Fill every room on the dimensions page with the same dimensions and submit it."""
+    page.goto(f"{url}/dimensions?rooms={rooms}")
+    page.evaluate(
+        """([length, width, height]) => {
+            document.querySelectorAll("input[name^='length-']").forEach(input => input.value = length);
+            document.querySelectorAll("input[name^='width-']").forEach(input => input.value = width);
+            document.querySelectorAll("input[name^='height-']").forEach(input => input.value = height);
+        }""",
+        [length, width, height],
+    )
+    page.click("input[type='submit']")
+    expect(page).to_have_url(f"{url}/results")
+
+
 @pytest.mark.e2e
 class TestPaintCalculatorE2E:
     """End-to-end tests for the paint calculator application."""
@@ -101,9 +135,6 @@ class TestPaintCalculatorE2E:
         # Click View Results button
         page.click("button:has-text('View Results')")
         
-        # Wait for modal to appear and API call to complete (wait for AJAX)
-        page.wait_for_timeout(6000)  # Wait for the setTimeout(5000) + API call
-        
         # Check modal is visible
         modal = page.locator("#resultsModal")
         expect(modal).to_be_visible()
@@ -116,12 +147,12 @@ class TestPaintCalculatorE2E:
         
         # Verify calculations are displayed
         # Room 1: ((10*2) + (12*2)) * 8 = 352 ft, 1 gallon
-        expect(page.locator("#room-1 .room-number")).to_contain_text("1")
-        expect(page.locator("#room-1 .room-feet")).to_contain_text("352")
-        expect(page.locator("#room-1 .room-total-gallons")).to_contain_text("1")
+        expect(page.locator("#room-1 .room-number")).to_have_text("1")
+        expect(page.locator("#room-1 .room-feet")).to_have_text("352")
+        expect(page.locator("#room-1 .room-total-gallons")).to_have_text("1")
         
         # Verify total gallons
-        expect(page.locator("#sumGallons")).to_contain_text("Total Gallons Required: 1")
+        expect(page.locator("#sumGallons")).to_have_text("Total Gallons Required: 1")
     
     def test_multiple_rooms_calculation(self, page: Page, app_url):
         """Test calculation with multiple rooms."""
@@ -142,19 +173,18 @@ class TestPaintCalculatorE2E:
         
         # Open results modal
         page.click("button:has-text('View Results')")
-        page.wait_for_timeout(6000)
         
         # Verify both rooms are displayed
-        expect(page.locator("#room-1 .room-number")).to_contain_text("1")
-        expect(page.locator("#room-1 .room-feet")).to_contain_text("400")
-        expect(page.locator("#room-1 .room-total-gallons")).to_contain_text("1")
+        expect(page.locator("#room-1 .room-number")).to_have_text("1")
+        expect(page.locator("#room-1 .room-feet")).to_have_text("400")
+        expect(page.locator("#room-1 .room-total-gallons")).to_have_text("1")
         
-        expect(page.locator("#room-2 .room-number")).to_contain_text("2")
-        expect(page.locator("#room-2 .room-feet")).to_contain_text("486")
-        expect(page.locator("#room-2 .room-total-gallons")).to_contain_text("2")
+        expect(page.locator("#room-2 .room-number")).to_have_text("2")
+        expect(page.locator("#room-2 .room-feet")).to_have_text("486")
+        expect(page.locator("#room-2 .room-total-gallons")).to_have_text("2")
         
         # Verify total gallons (1 + 2 = 3)
-        expect(page.locator("#sumGallons")).to_contain_text("Total Gallons Required: 3")
+        expect(page.locator("#sumGallons")).to_have_text("Total Gallons Required: 3")
     
     def test_negative_rooms_sanitized(self, page: Page, app_url):
         """Test that negative room numbers are sanitized."""
@@ -198,3 +228,78 @@ class TestPaintCalculatorE2E:
         expect(page.locator("text=1 gallon of paint is required for every 400ft of surface")).to_be_visible()
         expect(page.locator("text=((Length * 2) + (Width * 2)) * Height")).to_be_visible()
         expect(page.locator("text=Gallons required will be rounded up")).to_be_visible()
+
+
+@pytest.mark.e2e
+class TestClientSideCalculationsE2E:
+    """End-to-end tests for the calculations done by result-injector.js."""
+
+    def test_results_calculated_without_api_calls(self, page: Page, app_url):
+        """Test that results are calculated in the browser when verification is disabled."""
+        api_requests = []
+        page.on("request", lambda request: api_requests.append(request.url)
+                if "/api/v1/calculate" in request.url else None)
+
+        submit_rooms(page, app_url, 1, "10", "12", "8")
+        page.click("button:has-text('View Results')")
+
+        expect(page.locator("#room-1 .room-feet")).to_have_text("352")
+        expect(page.locator("#sumGallons")).to_have_text("Total Gallons Required: 1")
+        assert api_requests == []
+
+    def test_server_fills_rooms_the_browser_rejects(self, page: Page, app_url):
+        """Test that rooms the browser can't calculate are calculated by the server instead of left blank."""
+        def use_python_only_integer(route):
+            # Python's int() accepts '1_0' as 10, the browser doesn't
+            response = route.fetch()
+            body = response.text().replace("&#34;10&#34;", "&#34;1_0&#34;").replace('"10"', '"1_0"')
+            route.fulfill(response=response, body=body)
+
+        page.route("**/results", use_python_only_integer)
+
+        submit_rooms(page, app_url, 1, "10", "12", "8")
+        page.click("button:has-text('View Results')")
+
+        expect(page.locator("#room-1 .room-feet")).to_have_text("352")
+        expect(page.locator("#sumGallons")).to_have_text("Total Gallons Required: 1")
+
+    def test_many_rooms_calculated_in_worker(self, page: Page, app_url):
+        """Test that more than 1000 rooms are calculated in a Web Worker and rendered over several frames."""
+        with page.expect_worker() as worker_info:
+            submit_rooms(page, app_url, 1001, "10", "12", "8")
+        assert worker_info.value.url.endswith("js/paint-calculations.js")
+
+        page.click("button:has-text('View Results')")
+
+        # Each room: ((10*2) + (12*2)) * 8 = 352 ft, 1 gallon
+        expect(page.locator("#room-1 .room-feet")).to_have_text("352")
+        expect(page.locator("#room-1001 .room-number")).to_have_text("1001")
+        expect(page.locator("#room-1001 .room-feet")).to_have_text("352")
+        expect(page.locator("#room-1001 .room-total-gallons")).to_have_text("1")
+        expect(page.locator("#sumGallons")).to_have_text("Total Gallons Required: 1001")
+
+    def test_verification_batches_and_corrects_mismatch(self, page: Page, verify_app_url):
+        """Test that verification sends rooms in batches and shows the server's values on a mismatch."""
+        batches = []
+
+        def tamper_with_room_1(route):
+            # Make the server disagree with the browser about room-1
+            response = route.fetch()
+            body = response.json()
+            batches.append(sorted(key for key in body if key != "total_gallons"))
+            if "room-1" in body:
+                body["room-1"]["ft"] = 2000
+                body["room-1"]["gallons"] = 5
+                body["total_gallons"] += 4
+            route.fulfill(response=response, json=body)
+
+        page.route("**/api/v1/calculate", tamper_with_room_1)
+
+        submit_rooms(page, verify_app_url, 3, "10", "12", "8")
+        page.click("button:has-text('View Results')")
+
+        expect(page.locator("#room-1 .room-feet")).to_have_text("2000")
+        expect(page.locator("#room-1 .room-total-gallons")).to_have_text("5")
+        expect(page.locator("#room-2 .room-feet")).to_have_text("352")
+        expect(page.locator("#sumGallons")).to_have_text("Total Gallons Required: 7")
+        assert batches == [["room-1", "room-2"], ["room-3"]]
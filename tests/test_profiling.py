@@ -0,0 +1,155 @@
+"""
+Unit tests for the request profiling hooks and admin endpoints.
+"""
+import pytest
+import json
+import pstats
+import re
+import threading
+import time
+from paint_calculator.run import app
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Create a test client with profiling enabled and profiles stored in a temp directory."""
+    app.config['TESTING'] = True
+    # monkeypatch restores the original settings, including any changed by the tests below
+    for key, value in {'PROFILING_ENABLED': True, 'PROFILING_TOKEN': 'secret', 'PROFILING_SAMPLE_RATE': 0.0,
+                       'PROFILING_DIR': str(tmp_path), 'PROFILING_MAX_PROFILES': 2}.items():
+        monkeypatch.setitem(app.config, key, value)
+    with app.test_client() as client:
+        yield client
+
+
+def calculate(client, headers=None):
+    data = {'room-1': {'length': '10', 'width': '12', 'height': '8'}}
+    return client.post('/api/v1/calculate', data=json.dumps(data),
+                       content_type='application/json', headers=headers or {})
+
+
+class TestProfiling:
+    """Test cases for on-demand and sampled profiling."""
+
+    def test_unflagged_request_not_profiled(self, client, tmp_path):
+        """Test that requests without the profiling header are not profiled."""
+        assert calculate(client).status_code == 200
+        assert list(tmp_path.iterdir()) == []
+
+    def test_wrong_token_not_profiled(self, client, tmp_path):
+        """Test that a header with the wrong token is ignored."""
+        assert calculate(client, {'X-Profile': 'wrong'}).status_code == 200
+        assert list(tmp_path.iterdir()) == []
+
+    def test_flagged_request_profiled(self, client, tmp_path):
+        """Test that a request with the profiling header stores a profile."""
+        assert calculate(client, {'X-Profile': 'secret'}).status_code == 200
+        assert sorted(p.suffix for p in tmp_path.iterdir()) == ['.collapsed', '.pstats']
+
+    def test_profile_id_header(self, client):
+        """Test that a profiled request is told the id of its stored profile, and others get no id."""
+        assert 'X-Profile-Id' not in calculate(client).headers
+        app.config['PROFILING_SAMPLE_RATE'] = 1.0
+        sampled_id = calculate(client).headers['X-Profile-Id']
+        profile_id = calculate(client, {'X-Profile': 'secret'}).headers['X-Profile-Id']
+        assert profile_id != sampled_id
+
+        headers = {'X-Profile': 'secret'}
+        assert client.get(f'/admin/profiles/{profile_id}.pstats', headers=headers).status_code == 200
+        collapsed_response = client.get(f'/admin/profiles/{profile_id}.collapsed', headers=headers)
+        assert collapsed_response.status_code == 200
+        assert 'calculate (api.py:' in collapsed_response.text
+
+    def test_query_flag_profiles_rendering(self, client, tmp_path):
+        """Test that the `profile` query arg profiles a template-rendering route."""
+        response = client.post('/results?profile=secret',
+                               data={'length-0': '10', 'width-0': '12', 'height-0': '8'})
+        assert response.status_code == 200
+        assert len(list(tmp_path.glob('*.pstats'))) == 1
+
+    def test_sampling(self, client, tmp_path):
+        """Test that a sample rate of 1.0 profiles every request."""
+        app.config['PROFILING_SAMPLE_RATE'] = 1.0
+        assert calculate(client).status_code == 200
+        assert len(list(tmp_path.glob('*.pstats'))) == 1
+
+    def test_disabled_ignores_flag(self, client, tmp_path):
+        """Test that the profiling header does nothing while profiling is disabled."""
+        app.config['PROFILING_ENABLED'] = False
+        assert calculate(client, {'X-Profile': 'secret'}).status_code == 200
+        assert list(tmp_path.iterdir()) == []
+
+    def test_ring_buffer_keeps_newest(self, client, tmp_path):
+        """Test that only PROFILING_MAX_PROFILES profiles are kept."""
+        for _ in range(4):
+            calculate(client, {'X-Profile': 'secret'})
+        assert len(list(tmp_path.glob('*.pstats'))) == 2
+        assert len(list(tmp_path.glob('*.collapsed'))) == 2
+
+    def test_other_threads_not_profiled(self, client, tmp_path):
+        """Test that work running in another thread during a profiled request is not recorded."""
+        stop = threading.Event()
+
+        def background_work():
+            while not stop.is_set():
+                time.sleep(0.001)
+
+        thread = threading.Thread(target=background_work)
+        thread.start()
+        try:
+            calculate(client, {'X-Profile': 'secret'})
+        finally:
+            stop.set()
+            thread.join()
+        collapsed = next(tmp_path.glob('*.collapsed')).read_text()
+        assert 'calculate (api.py:' in collapsed
+        assert 'background_work' not in collapsed
+
+
+class TestProfilesAdmin:
+    """Test cases for the /admin/profiles endpoints."""
+
+    def test_admin_requires_token(self, client):
+        """Test that the admin endpoints reject requests without the token."""
+        assert client.get('/admin/profiles').status_code == 403
+
+    def test_admin_requires_configured_token(self, client, tmp_path):
+        """Test that profiling fails closed when enabled without a token."""
+        app.config['PROFILING_TOKEN'] = None
+        assert calculate(client, {'X-Profile': 'anything'}).status_code == 200
+        assert list(tmp_path.iterdir()) == []
+        assert client.get('/admin/profiles', headers={'X-Profile': 'anything'}).status_code == 403
+        assert client.get('/admin/profiles?profile=x').status_code == 403
+
+    def test_admin_hidden_when_disabled(self, client):
+        """Test that the admin endpoints are hidden while profiling is disabled."""
+        app.config['PROFILING_ENABLED'] = False
+        assert client.get('/admin/profiles', headers={'X-Profile': 'secret'}).status_code == 404
+
+    def test_admin_serves_profiles(self, client, tmp_path):
+        """Test listing and downloading a stored profile in both formats."""
+        calculate(client, {'X-Profile': 'secret'})
+        headers = {'X-Profile': 'secret'}
+        profile_ids = client.get('/admin/profiles', headers=headers).get_json()
+        assert len(profile_ids) == 1
+        assert profile_ids[0].endswith('-POST-api.calculate')
+
+        pstats_response = client.get(f'/admin/profiles/{profile_ids[0]}.pstats', headers=headers)
+        assert pstats_response.status_code == 200
+        assert pstats_response.data
+
+        assert pstats.Stats(str(tmp_path / f'{profile_ids[0]}.pstats')).total_calls > 0
+
+        collapsed_response = client.get(f'/admin/profiles/{profile_ids[0]}.collapsed', headers=headers)
+        assert collapsed_response.status_code == 200
+        # Stacks run from the caller of the WSGI app through the view to the calculation helpers
+        stacks = [line.rsplit(' ', 1)[0] for line in collapsed_response.text.splitlines()]
+        assert any(re.search(r'__call__ \(app\.py:\d+\);.*dispatch_request \(app\.py:\d+\);'
+                             r'calculate \(api\.py:\d+\);calculate_rooms \(api\.py:\d+\)', stack)
+                   for stack in stacks)
+
+    def test_admin_unknown_profile(self, client):
+        """Test that an unknown profile id returns 404."""
+        headers = {'X-Profile': 'secret'}
+        assert client.get('/admin/profiles/nope.collapsed', headers=headers).status_code == 404
+        assert client.get('/admin/profiles/00000000000000000000-x.pstats', headers=headers).status_code == 404
@@ -90,6 +90,33 @@ class TestResultsRoute:
         assert response.status_code == 200
         assert b'View Results' in response.data
 
+    def test_results_route_calculates_client_side(self, client):
+        """Test that the results page loads the client-side calculations without server verification."""
+        data = {'length-0': '10', 'width-0': '12', 'height-0': '8'}
+        response = client.post('/results', data=data)
+        assert response.status_code == 200
+        assert b'js/paint-calculations.js' in response.data
+        assert b'data-verify="false"' in response.data
+
+    def test_results_route_verification_enabled(self, client, monkeypatch):
+        """Test that VERIFY_RESULTS enables server verification on the results page."""
+        data = {'length-0': '10', 'width-0': '12', 'height-0': '8'}
+        monkeypatch.setitem(app.config, 'VERIFY_RESULTS', True)
+        monkeypatch.setitem(app.config, 'VERIFY_BATCH_SIZE', 250)
+        response = client.post('/results', data=data)
+        assert response.status_code == 200
+        assert b'data-verify="true"' in response.data
+        assert b'data-verify-batch-size="250"' in response.data
+
+    def test_results_route_verification_batch_size_clamped(self, client, monkeypatch):
+        """Test that the verification batch size is kept between 1 and MAX_ROOMS."""
+        data = {'length-0': '10', 'width-0': '12', 'height-0': '8'}
+        monkeypatch.setitem(app.config, 'MAX_ROOMS', 300)
+        monkeypatch.setitem(app.config, 'VERIFY_BATCH_SIZE', 0)
+        assert b'data-verify-batch-size="1"' in client.post('/results', data=data).data
+        monkeypatch.setitem(app.config, 'VERIFY_BATCH_SIZE', 50000)
+        assert b'data-verify-batch-size="300"' in client.post('/results', data=data).data
+
 
 class TestAPICalculateRoute:
     """Test cases for the API calculate endpoint."""
@@ -186,3 +213,47 @@ class TestAPICalculateRoute:
                               content_type='application/json')
         # Should handle missing fields gracefully
         assert response.status_code in [200, 400, 500]
+
+    def test_api_calculate_duplicate_rooms(self, client):
+        """Test that a duplicated room key keeps only its last value, in the room and the total."""
+        response = client.post('/api/v1/calculate',
+                              data='{"room-1": {"length": "20", "width": "20", "height": "6"},'
+                                   ' "room-1": {"length": "10", "width": "12", "height": "8"}}',
+                              content_type='application/json')
+        assert response.status_code == 200
+        result = json.loads(response.data)
+        assert result['room-1']['gallons'] == 1
+        assert result['total_gallons'] == 1
+
+    def test_api_calculate_malformed_json(self, client):
+        """Test that truncated JSON is rejected with 400."""
+        response = client.post('/api/v1/calculate',
+                              data='{"room-1": {"length": "10", "width": "12", "height": "8"}',
+                              content_type='application/json')
+        assert response.status_code == 400
+        assert json.loads(response.data)['error'] == 'Invalid JSON payload'
+
+    def test_api_calculate_non_object_payload(self, client):
+        """Test that a JSON payload that is not an object is rejected with 400."""
+        response = client.post('/api/v1/calculate',
+                              data=json.dumps([{'length': '10', 'width': '12', 'height': '8'}]),
+                              content_type='application/json')
+        assert response.status_code == 400
+
+    def test_api_calculate_body_too_large(self, client, monkeypatch):
+        """Test that a body over MAX_CONTENT_LENGTH is rejected with 413."""
+        data = {f'room-{i}': {'length': '10', 'width': '12', 'height': '8'} for i in range(1, 101)}
+        monkeypatch.setitem(app.config, 'MAX_CONTENT_LENGTH', 1024)
+        response = client.post('/api/v1/calculate',
+                              data=json.dumps(data),
+                              content_type='application/json')
+        assert response.status_code == 413
+
+    def test_api_calculate_too_many_rooms(self, client, monkeypatch):
+        """Test that more than MAX_ROOMS rooms are rejected with 413."""
+        data = {f'room-{i}': {'length': '10', 'width': '12', 'height': '8'} for i in range(1, 4)}
+        monkeypatch.setitem(app.config, 'MAX_ROOMS', 2)
+        response = client.post('/api/v1/calculate',
+                              data=json.dumps(data),
+                              content_type='application/json')
+        assert response.status_code == 413